@@ -1,19 +1,182 @@
 import flet as ft
-import qrcode
-import base64
+import binascii
 import os
 import json
 import re
+import threading
+import time
 from io import BytesIO
-from PIL import Image
-from Crypto.Cipher import AES
-from Crypto.Util.Padding import pad, unpad
-from Crypto.Random import get_random_bytes
-from typing import Optional, Tuple, Dict, Any
+from dataclasses import dataclass, asdict, fields, replace
+from functools import lru_cache, partial
+from typing import Optional, Tuple, Dict, Any, Callable
+
+# تسلسل JSON عبر orjson إن توفر (يكتب النص العربي كـ UTF-8 مباشرة)، وإلا json القياسي
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=4).encode('utf-8')
+
+    _json_loads = json.loads
+
+# أنماط التحقق المترجمة مسبقاً
+_DIGIT_RE = re.compile(r'\A\d+\Z')
+_HEX_DIGITS = frozenset('0123456789abcdefABCDEF')
+
+
+@lru_cache(maxsize=None)
+def _get_segno():
+    """استيراد segno عند أول توليد لـ QR Code بدلاً من وقت بدء التطبيق"""
+    import segno
+    return segno
+
+
+def _pycryptodome_gcm_encryptor(key: bytes) -> Callable[[bytes, bytes], Tuple[bytes, bytes]]:
+    """مزود AES-GCM عبر PyCryptodome (يستخدم AES-NI)"""
+    from Crypto.Cipher import AES
+    # المفتاح والوضع مثبتان مسبقاً، فلا يبقى لكل عملية تشفير سوى nonce جديد
+    cipher_factory = partial(AES.new, key, AES.MODE_GCM)
+
+    def encrypt(nonce: bytes, plaintext: bytes) -> Tuple[bytes, bytes]:
+        return cipher_factory(nonce=nonce).encrypt_and_digest(plaintext)
+    return encrypt
+
+
+def _openssl_gcm_encryptor(key: bytes) -> Callable[[bytes, bytes], Tuple[bytes, bytes]]:
+    """مزود AES-GCM عبر OpenSSL EVP من مكتبة cryptography"""
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    aesgcm = AESGCM(key)
+
+    def encrypt(nonce: bytes, plaintext: bytes) -> Tuple[bytes, bytes]:
+        # يُرجع AESGCM النص المشفر متبوعاً بوسم المصادقة (16 بايت)
+        sealed = aesgcm.encrypt(nonce, plaintext, None)
+        return sealed[:-16], sealed[-16:]
+    return encrypt
+
+
+# مزودو التشفير بترتيب الأفضلية
+_GCM_PROVIDERS = (_pycryptodome_gcm_encryptor, _openssl_gcm_encryptor)
+
+
+@lru_cache(maxsize=None)
+def _make_gcm_encryptor(key: bytes) -> Callable[[bytes, bytes], Tuple[bytes, bytes]]:
+    """إنشاء دالة تشفير AES-GCM بأول مزود متاح، تُرجع النص المشفر ووسم المصادقة"""
+    # يُستورد المزود عند أول استخدام؛ OSError يعني أن الحزمة مثبتة لكن مكتبتها الأصلية
+    # لا تُحمّل (كما في بعض بيئات Android)، فيُجرب المزود التالي
+    for provider in _GCM_PROVIDERS:
+        try:
+            return provider(key)
+        except (ImportError, OSError):
+            continue
+    raise RuntimeError("No AES-GCM provider available (install pycryptodome or cryptography)")
+
+
+# خيارات اللغة (الرمز، الاسم المعروض)
+_LANGUAGE_OPTIONS = (("ar", "العربية"), ("en", "الإنجليزية"))
+
+# ثوابت عناصر الواجهة المتكررة في بطاقة المعلومات
+_RIGHT = ft.TextAlign.RIGHT
+_END = ft.MainAxisAlignment.END
+_SHIELD_KWARGS = dict(name=ft.icons.SHIELD, size=20)
+_PREFIXES = tuple(f"{i+1}. " for i in range(32))
+
+# أعلام فتح ملف المفتاح: وضع ثنائي على Windows وعدم توريث الواصف للعمليات الفرعية
+_KEY_FILE_FLAGS = getattr(os, 'O_BINARY', 0) | getattr(os, 'O_CLOEXEC', 0)
+
+
+# أطوال مفاتيح AES المقبولة: مفاتيح 128-bit القديمة تبقى صالحة لفك رموزها السابقة
+_AES_KEY_SIZES = (16, 24, 32)
+
+
+def _read_key_file(key_file: str) -> bytes:
+    """قراءة مفتاح التشفير من الملف مع رفض الملفات الفارغة أو الناقصة أو الزائدة"""
+    fd = os.open(key_file, os.O_RDONLY | _KEY_FILE_FLAGS)
+    try:
+        # قراءة بايت زائد لاكتشاف الملفات الأطول من أكبر مفتاح بدلاً من اقتطاعها
+        key = os.read(fd, 33)
+    finally:
+        os.close(fd)
+    if len(key) > 32:
+        raise ValueError("Invalid key file length: more than 32 bytes")
+    if len(key) not in _AES_KEY_SIZES:
+        raise ValueError(f"Invalid key file length: {len(key)} bytes")
+    return key
+
+
+@lru_cache(maxsize=None)
+def _load_or_generate_key_file(key_file: str) -> bytes:
+    """قراءة مفتاح التشفير من الملف أو إنشاؤه، مع مشاركة النتيجة بين نسخ التطبيق"""
+    try:
+        return _read_key_file(key_file)
+    except FileNotFoundError:
+        pass
+    key = os.urandom(32)  # استخدام 256-bit key بدلاً من 128-bit
+    try:
+        # O_EXCL يمنع الكتابة عبر رابط رمزي أو فوق ملف أُنشئ في الأثناء
+        fd = os.open(key_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL | _KEY_FILE_FLAGS, 0o600)
+    except FileExistsError:
+        # نسخة أخرى أنشأت الملف للتو وقد لا تكون أكملت كتابته بعد، فتُعاد القراءة لفترة قصيرة
+        for _ in range(10):
+            try:
+                return _read_key_file(key_file)
+            except ValueError:
+                time.sleep(0.05)
+        return _read_key_file(key_file)
+    try:
+        # os.write قد يكتب جزءاً من البيانات فقط، فيُكمل الباقي حتى اكتمال المفتاح
+        remaining = memoryview(key)
+        while remaining:
+            remaining = remaining[os.write(fd, remaining):]
+    finally:
+        os.close(fd)
+    return key
+
+
+# مسار الحفظ الافتراضي يُحسب مرة واحدة عند تحميل الوحدة
+_DEFAULT_SAVE_PATH = os.path.join(os.path.expanduser("~"), "QR-pass")
+
+
+@dataclass(slots=True)
+class AppSettings:
+    """إعدادات التطبيق بحقول ثابتة وقيمها الافتراضية"""
+    save_path: str = _DEFAULT_SAVE_PATH
+    auto_save: bool = False
+    image_quality: str = "عالية"
+    qr_size: str = "متوسط"
+    qr_color: str = "#000000"
+    qr_bg_color: str = "#FFFFFF"
+    language: str = "ar"
+
+
+_SETTINGS_FIELDS = frozenset(f.name for f in fields(AppSettings))
+
 
 class QRCodeGeneratorApp:
+    # جداول ثابتة تُبنى مرة واحدة بدلاً من إنشائها في كل استدعاء
+    QR_SIZE_MAPPING = {
+        "صغير": 200,
+        "متوسط": 300,
+        "كبير": 400,
+        "كبير جداً": 500
+    }
+    # جودة الصورة -> مستوى ضغط zlib لملف PNG: الجودة الأقل تعني ملفاً أصغر وحفظاً أبطأ
+    IMAGE_QUALITY_MAPPING = {
+        "عالية جداً": 0,
+        "عالية": 1,
+        "متوسطة": 6,
+        "منخفضة": 9
+    }
+
     def __init__(self, page: ft.Page):
         self.page = page
+        # البطاقات الثابتة تُبنى عند أول عرض ثم يُعاد استخدامها
+        self._about_card = None
+        self._settings_card = None
         self.setup_page()
         self.setup_colors()
         self.setup_constants()
@@ -49,70 +212,83 @@ class QRCodeGeneratorApp:
             "dark_bg": "#0f172a",
             "dark_header": "#1e3a8a"
         }
+        # ألوان تُقرأ كثيراً عند بناء البطاقات، تُربط كسمات لتجنب البحث في القاموس
+        self._c_primary = self.colors["primary"]
+        self._c_secondary = self.colors["secondary"]
+        self._c_text = self.colors["text"]
         
     def setup_constants(self):
         """إعداد الثوابت والمتغيرات المهمة"""
         self.is_desktop = True
         self.KEY_FILE = "encryption_key.bin"
         self.SETTINGS_FILE = "settings.json"
+        self.QR_CACHE_SIZE = 32
+        self._settings_lock = threading.Lock()
+        # يمنع بدء عملية توليد ثانية قبل انتهاء الأولى (مثلاً عند النقر المزدوج)
+        self._generate_lock = threading.Lock()
         self.load_or_generate_key()
+        # تُجهز دالة التشفير عند أول استخدام ثم يُعاد استخدامها طوال الجلسة
+        self._gcm_encrypt = None
         
     def load_or_generate_key(self):
         """تحميل مفتاح التشفير من ملف أو توليد مفتاح جديد"""
         try:
-            if os.path.exists(self.KEY_FILE):
-                with open(self.KEY_FILE, 'rb') as f:
-                    self.KEY = f.read()
-            else:
-                self.KEY = get_random_bytes(32)  # استخدام 256-bit key بدلاً من 128-bit
-                with open(self.KEY_FILE, 'wb') as f:
-                    f.write(self.KEY)
+            self.KEY = _load_or_generate_key_file(self.KEY_FILE)
         except Exception as e:
             print(f"Error handling encryption key: {str(e)}")
-            self.KEY = get_random_bytes(32)
+            self.KEY = os.urandom(32)
             
     def setup_app_settings(self):
         """إعداد الإعدادات الافتراضية للتطبيق"""
-        self.app_settings = {
-            "save_path": os.path.join(os.path.expanduser("~"), "QR-pass"),
-            "auto_save": False,
-            "image_quality": "عالية",
-            "qr_size": "متوسط",
-            "qr_color": "#000000",
-            "qr_bg_color": "#FFFFFF",
-            "language": "ar"
-        }
+        self.app_settings = AppSettings()
         
     def load_settings(self):
         """تحميل الإعدادات من ملف"""
         try:
             if os.path.exists(self.SETTINGS_FILE):
-                with open(self.SETTINGS_FILE, 'r', encoding='utf-8') as f:
-                    loaded_settings = json.load(f)
-                    # التحقق من صحة المسار قبل التحميل
-                    if 'save_path' in loaded_settings and self.validate_path(loaded_settings['save_path']):
-                        self.app_settings.update(loaded_settings)
+                with open(self.SETTINGS_FILE, 'rb') as f:
+                    raw = f.read()
+                loaded_settings = _json_loads(raw)
+                # التحقق من صحة المسار قبل التحميل
+                if 'save_path' in loaded_settings and self.validate_path(loaded_settings['save_path']):
+                    # تجاهل أي مفاتيح غير معروفة في الملف
+                    self.app_settings = replace(
+                        self.app_settings,
+                        **{k: v for k, v in loaded_settings.items() if k in _SETTINGS_FIELDS}
+                    )
         except (FileNotFoundError, json.JSONDecodeError, PermissionError) as e:
             print(f"Error loading settings: {str(e)}")
             
     def save_settings(self):
         """حفظ الإعدادات إلى ملف"""
+        # قد تُستدعى من عدة خيوط، والقفل يمنع تداخل الكتابة في الملف المؤقت نفسه
+        with self._settings_lock:
+            self._write_settings_file()
+            
+    def _write_settings_file(self):
+        """تسلسل الإعدادات وكتابتها إلى الملف"""
         try:
-            with open(self.SETTINGS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.app_settings, f, ensure_ascii=False, indent=4)
+            data = _json_dumps(asdict(self.app_settings))
+            # الكتابة إلى ملف مؤقت ثم استبداله ذرياً حتى لا يبقى ملف إعدادات ناقص
+            tmp_file = self.SETTINGS_FILE + ".tmp"
+            try:
+                with open(tmp_file, 'wb') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, self.SETTINGS_FILE)
+            except Exception:
+                if os.path.exists(tmp_file):
+                    os.remove(tmp_file)
+                raise
         except Exception as e:
             print(f"Error saving settings: {str(e)}")
             
     def validate_path(self, path: str) -> bool:
         """التحقق من صحة مسار الحفظ"""
+        # فحص صلاحيات المجلد دون إنشاء ملف تجريبي وحذفه
         try:
-            if not os.path.isabs(path):
-                return False
-            test_file = os.path.join(path, "test.txt")
-            with open(test_file, 'w') as f:
-                f.write("test")
-            os.remove(test_file)
-            return True
+            return os.path.isabs(path) and os.path.isdir(path) and os.access(path, os.W_OK)
         except Exception:
             return False
             
@@ -121,7 +297,7 @@ class QRCodeGeneratorApp:
         if not self.employee_name.value or len(self.employee_name.value.strip()) < 2:
             return False, "يجب إدخال اسم صحيح (أحرف على الأقل)"
             
-        if not self.employee_id.value or not re.match(r'^\d+$', self.employee_id.value):
+        if not self.employee_id.value or not _DIGIT_RE.match(self.employee_id.value):
             return False, "يجب إدخال رقم وظيفي صحيح (أرقام فقط)"
             
         if not self.department.value or len(self.department.value.strip()) < 2:
@@ -199,8 +375,8 @@ class QRCodeGeneratorApp:
     def setup_input_fields(self):
         """إعداد حقول إدخال البيانات"""
         field_style = {
-            "border_color": self.colors["primary"],
-            "focused_border_color": self.colors["secondary"],
+            "border_color": self._c_primary,
+            "focused_border_color": self._c_secondary,
             "width": 400,
             "text_size": 16,
             "border_radius": 8,
@@ -240,21 +416,21 @@ class QRCodeGeneratorApp:
         
     def setup_qr_display(self):
         """إعداد عناصر عرض QR Code"""
-        self.employee_name_display = ft.Text("", size=14, color=self.colors["text"], text_align=ft.TextAlign.RIGHT)
-        self.employee_id_display = ft.Text("", size=14, color=self.colors["text"], text_align=ft.TextAlign.RIGHT)
-        self.department_display = ft.Text("", size=14, color=self.colors["text"], text_align=ft.TextAlign.RIGHT)
+        self.employee_name_display = ft.Text("", size=14, color=self._c_text, text_align=ft.TextAlign.RIGHT)
+        self.employee_id_display = ft.Text("", size=14, color=self._c_text, text_align=ft.TextAlign.RIGHT)
+        self.department_display = ft.Text("", size=14, color=self._c_text, text_align=ft.TextAlign.RIGHT)
         
         self.progress_ring = ft.ProgressRing(
             width=40, 
             height=40, 
             stroke_width=4, 
-            color=self.colors["primary"],
+            color=self._c_primary,
             visible=False
         )
         
         self.loading_text = ft.Text(
             "جارِ التوليد...",
-            color=self.colors["primary"],
+            color=self._c_primary,
             size=16,
             visible=False,
             text_align=ft.TextAlign.RIGHT,
@@ -267,6 +443,14 @@ class QRCodeGeneratorApp:
             fit=ft.ImageFit.CONTAIN,
             visible=False,
         )
+        self._last_qr = None
+        self._last_qr_colors = ("#000000", "#FFFFFF")
+        self._last_png_bytes = b""
+        # القفل يحمي حالة آخر رمز والذاكرة المؤقتة بين خيط التوليد وخيوط الحفظ
+        self._qr_state_lock = threading.Lock()
+        # (البيانات، لون الرمز، لون الخلفية) -> (صورة SVG بترميز base64، كائن الرمز، بايتات PNG)
+        self._qr_cache: Dict[Tuple[str, str, str], Tuple[str, Any, bytes]] = {}
+        self._last_qr_key = None
         
         self.qr_container = ft.Container(
             content=self.qr_image,
@@ -292,7 +476,7 @@ class QRCodeGeneratorApp:
             "توليد QR Code",
             icon=ft.icons.QR_CODE_2,
             on_click=self.generate_qr_code,
-            style=self.create_button_style(self.colors["primary"], "white"),
+            style=self.create_button_style(self._c_primary, "white"),
             width=180,
             height=45,
         )
@@ -301,7 +485,7 @@ class QRCodeGeneratorApp:
             "مسح البيانات",
             icon=ft.icons.CLEANING_SERVICES,
             on_click=self.clear_fields,
-            style=self.create_button_style(self.colors["text"], None),
+            style=self.create_button_style(self._c_text, None),
             width=180,
             height=45,
         )
@@ -317,7 +501,7 @@ class QRCodeGeneratorApp:
         )
         
         self.result_text = ft.Text("", size=16, text_align=ft.TextAlign.RIGHT)
-        self.save_result = ft.Text("", size=14, color=self.colors["text"], text_align=ft.TextAlign.RIGHT)
+        self.save_result = ft.Text("", size=14, color=self._c_text, text_align=ft.TextAlign.RIGHT)
         
     def create_button_style(self, bgcolor: Optional[str], color: Optional[str]) -> ft.ButtonStyle:
         """إنشاء نمط موحد للأزرار"""
@@ -345,16 +529,27 @@ class QRCodeGeneratorApp:
             expand=True,
         )
         
+        # بناء تخطيطي سطح المكتب والجوال مرة واحدة والتبديل بينهما عند تغيير الحجم
+        self._desktop_controls = [
+            self.sidebar_rail,
+            ft.VerticalDivider(width=1),
+            ft.Container(
+                content=self.main_content,
+                expand=True,
+                padding=20,
+            ),
+        ]
+        self._mobile_controls = [
+            ft.Container(
+                content=self.main_content,
+                expand=True,
+                padding=10,
+            ),
+        ]
+        self._last_layout_mode = None
+        
         self.page_layout = ft.Row(
-            [
-                self.sidebar_rail,
-                ft.VerticalDivider(width=1),
-                ft.Container(
-                    content=self.main_content,
-                    expand=True,
-                    padding=20,
-                ),
-            ],
+            self._desktop_controls,
             expand=True,
         )
         
@@ -365,7 +560,7 @@ class QRCodeGeneratorApp:
                 content=ft.Column(
                     [
                         ft.ListTile(
-                            leading=ft.Icon(ft.icons.PERSON_ADD, color=self.colors["primary"], size=30),
+                            leading=ft.Icon(ft.icons.PERSON_ADD, color=self._c_primary, size=30),
                             title=ft.Text("بيانات الموظف", weight=ft.FontWeight.BOLD, size=18, text_align=ft.TextAlign.RIGHT),
                             subtitle=ft.Text("أدخل بيانات الموظف لتوليد QR Code مشفر", text_align=ft.TextAlign.RIGHT),
                         ),
@@ -449,7 +644,7 @@ class QRCodeGeneratorApp:
                 content=ft.Column(
                     [
                         ft.ListTile(
-                            leading=ft.Icon(ft.icons.QR_CODE_SCANNER, color=self.colors["primary"], size=30),
+                            leading=ft.Icon(ft.icons.QR_CODE_SCANNER, color=self._c_primary, size=30),
                             title=ft.Text("معاينة QR Code", weight=ft.FontWeight.BOLD, size=18, text_align=ft.TextAlign.RIGHT),
                             subtitle=ft.Text("QR Code مشفر بخوارزمية AES", text_align=ft.TextAlign.RIGHT),
                         ),
@@ -495,100 +690,164 @@ class QRCodeGeneratorApp:
         self.sidebar_rail.on_change = self.handle_tab_selection
         
     def encrypt_data(self, data: str) -> str:
-        """تشفير البيانات باستخدام AES-256-CBC"""
-        cipher = AES.new(self.KEY, AES.MODE_CBC)
-        ct_bytes = cipher.encrypt(pad(data.encode('utf-8'), AES.block_size))
-        iv = base64.b64encode(cipher.iv).decode('utf-8')
-        ct = base64.b64encode(ct_bytes).decode('utf-8')
-        return f"{iv}:{ct}"
+        """تشفير البيانات ومصادقتها باستخدام AES-256-GCM"""
+        if self._gcm_encrypt is None:
+            self._gcm_encrypt = _make_gcm_encryptor(self.KEY)
+        nonce = os.urandom(12)
+        ct_bytes, tag = self._gcm_encrypt(nonce, data.encode('utf-8'))
+        # b2a_base64 يرمّز مباشرة دون طبقة وحدة base64
+        nonce = binascii.b2a_base64(nonce, newline=False).decode('ascii')
+        tag = binascii.b2a_base64(tag, newline=False).decode('ascii')
+        ct = binascii.b2a_base64(ct_bytes, newline=False).decode('ascii')
+        return f"{nonce}:{tag}:{ct}"
         
     def generate_qr_code(self, e):
         """توليد QR Code من البيانات المدخلة"""
+        # تجاهل النقر إن كانت عملية توليد سابقة ما زالت جارية
+        if not self._generate_lock.acquire(blocking=False):
+            return
+        
         # التحقق من صحة الإدخالات
         is_valid, error_msg = self.validate_inputs()
         if not is_valid:
+            self._generate_lock.release()
             self.show_error_message(error_msg)
             return
+        
+        # التقاط القيم التي تم التحقق منها، فلا يرى الخيط تعديلات تمت بعد النقر
+        data = self.collect_employee_data()
+        fields = (self.employee_name.value, self.employee_id.value, self.department.value)
 
         # عرض مؤشر التحميل
         self.show_loading(True)
         
+        # تنفيذ التشفير وتوليد الصورة في خيط منفصل حتى لا تتجمد الواجهة
+        self.page.run_thread(self._generate_qr_worker, e, data, fields)
+        
+    def _generate_qr_worker(self, e, data: str, fields: Tuple[str, str, str]):
+        """تنفيذ خطوات توليد QR Code خارج خيط واجهة المستخدم"""
+        # يصبح صحيحاً فقط بعد إرسال إخفاء المؤشر مع الرسالة إلى الواجهة فعلاً
+        flushed = False
         try:
-            # تجميع البيانات
-            data = self.collect_employee_data()
-            
-            # تشفير البيانات
-            encrypted_data = self.encrypt_data(data)
-            
-            # إنشاء QR Code
+            # تشفير البيانات وإنشاء QR Code (أو استرجاعه من الذاكرة المؤقتة)
             qr_size = self.get_qr_size()
-            img_str = self.create_qr_code_image(encrypted_data, qr_size)
+            img_str = self.get_qr_image(data, qr_size)
             
             # تحديث واجهة المستخدم
-            self.update_ui_after_qr_generation(img_str, qr_size, data)
+            self.update_ui_after_qr_generation(img_str, qr_size, data, fields)
             
             # الحفظ التلقائي إذا كان مفعلاً
-            if self.app_settings["auto_save"]:
-                self.save_qr_code(e)
+            if self.app_settings.auto_save:
+                self.save_qr_code(e, employee_id=fields[1])
             
+            # إخفاء المؤشر قبل الرسالة ليُرسل مع تحديثها في دفعة واحدة
+            self.show_loading(False, update=False)
             self.show_success_message("تم توليد QR Code بنجاح")
+            flushed = True
             
         except Exception as ex:
+            self.show_loading(False, update=False)
             self.show_error_message(f"حدث خطأ أثناء توليد QR Code: {str(ex)}")
+            flushed = True
             
         finally:
-            self.show_loading(False)
+            try:
+                # فشل إرسال الرسالة يعني أن إخفاء المؤشر وتفعيل الزر لم يصلا للواجهة
+                if not flushed:
+                    self.show_loading(False)
+            finally:
+                self._generate_lock.release()
     
     def collect_employee_data(self) -> str:
         """جمع بيانات الموظف من الحقول"""
-        data = f"الاسم: {self.employee_name.value}\nالرقم الوظيفي: {self.employee_id.value}\nالقسم: {self.department.value}"
+        parts = [
+            f"الاسم: {self.employee_name.value}",
+            f"الرقم الوظيفي: {self.employee_id.value}",
+            f"القسم: {self.department.value}",
+        ]
         if self.additional_info.value:
-            data += f"\nمعلومات إضافية: {self.additional_info.value}"
-        return data
+            parts.append(f"معلومات إضافية: {self.additional_info.value}")
+        return "\n".join(parts)
         
     def get_qr_size(self) -> int:
         """الحصول على حجم QR Code بناءً على الإعدادات"""
-        size_mapping = {
-            "صغير": 200,
-            "متوسط": 300,
-            "كبير": 400,
-            "كبير جداً": 500
-        }
-        return size_mapping.get(self.app_settings["qr_size"], 300)
-        
-    def create_qr_code_image(self, data: str, size: int) -> str:
-        """إنشاء صورة QR Code وإرجاعها كسلسلة base64"""
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_H,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(data)
-        qr.make(fit=True)
+        return self.QR_SIZE_MAPPING.get(self.app_settings.qr_size, 300)
+        
+    def get_qr_image(self, data: str, size: int) -> str:
+        """إرجاع صورة QR Code للبيانات مع إعادة استخدام النتائج السابقة لنفس المدخلات"""
+        dark = self.app_settings.qr_color
+        light = self.app_settings.qr_bg_color
+        # الألوان تُقرأ مرة واحدة فيتطابق مفتاح الذاكرة المؤقتة مع ألوان الصورة المرسومة
+        key = (data, dark, light)
+        
+        with self._qr_state_lock:
+            cached = self._qr_cache.pop(key, None)
+            if cached is not None:
+                # إعادة إدراج المدخل في النهاية ليُحذف الأقدم استخداماً أولاً (LRU)
+                self._qr_cache[key] = cached
+                # يُعاد استخدام ملف PNG أيضاً إن كان قد وُلد عند حفظ سابق
+                img_str, self._last_qr, self._last_png_bytes = cached
+                self._last_qr_colors = (dark, light)
+                self._last_qr_key = key
+                return img_str
+        
+        img_str = self.create_qr_code_image(self.encrypt_data(data), size, dark, light)
+        with self._qr_state_lock:
+            self._last_qr_key = key
+            if len(self._qr_cache) >= self.QR_CACHE_SIZE:
+                del self._qr_cache[next(iter(self._qr_cache))]
+            self._qr_cache[key] = (img_str, self._last_qr, b"")
+        return img_str
+        
+    def create_qr_code_image(self, data: str, size: int, dark: str, light: str) -> str:
+        """إنشاء صورة QR Code بصيغة SVG بالألوان المحددة وإرجاعها كسلسلة base64"""
+        qr = _get_segno().make_qr(data, error="h")
 
-        # إنشاء الصورة مع الألوان المخصصة
-        img = qr.make_image(
-            fill_color=self.app_settings.get("qr_color", "#000000"),
-            back_color=self.app_settings.get("qr_bg_color", "#FFFFFF")
-        )
-        
-        # تحويل الصورة إلى Base64
+        # الاحتفاظ بالرمز وألوانه لتوليد ملف PNG عند الحفظ فقط
+        with self._qr_state_lock:
+            self._last_qr = qr
+            self._last_qr_colors = (dark, light)
+            self._last_png_bytes = b""
+
+        # المعاينة بصيغة SVG المتجهية بدلاً من ضغط صورة PNG
+        # مخزن محلي لكل استدعاء، فلا يُعاد تحجيم مخزن ما زال عرض getbuffer() قائماً عليه
+        buffered = BytesIO()
+        qr.save(buffered, kind="svg", scale=10, border=4, dark=dark, light=light, xmldecl=False)
+        # getbuffer() يمرر محتوى المخزن دون نسخه إلى كائن bytes جديد
+        with buffered.getbuffer() as view:
+            return binascii.b2a_base64(view, newline=False).decode("ascii")
+        
+    def get_png_bytes(self, qr_state: Tuple[Any, Tuple[str, str], Any, int]) -> bytes:
+        """توليد بايتات PNG للرمز المحفوظ في qr_state عند الحاجة إليها للحفظ"""
+        qr, (dark, light), key, compresslevel = qr_state
+        with self._qr_state_lock:
+            # لا يُعاد استخدام PNG المخزن إلا إن كان لنفس الرمز الملتقط
+            if self._last_qr is qr and self._last_png_bytes:
+                return self._last_png_bytes
+        
+        # الرسم في مخزن محلي خارج القفل، فلا تتشارك عمليات الحفظ المتزامنة مخزناً واحداً
         buffered = BytesIO()
-        img.save(buffered, format="PNG", quality=self.get_image_quality())
-        return base64.b64encode(buffered.getvalue()).decode("utf-8")
+        # مستوى الضغط من إعداد الجودة؛ الافتراضي 1: ضغط أسرع مقابل زيادة طفيفة في الحجم
+        qr.save(buffered, kind="png", scale=10, border=4,
+                dark=dark, light=light, compresslevel=compresslevel)
+        png_bytes = buffered.getvalue()
+        
+        with self._qr_state_lock:
+            # قد يكون رمز جديد قد وُلد أثناء الحفظ، فلا يُكتب فوق حالته
+            if self._last_qr is qr:
+                self._last_png_bytes = png_bytes
+            
+            # تخزين ملف PNG مع مدخل الذاكرة المؤقتة للرمز الملتقط، حتى لو لم يعد الرمز الحالي
+            cached = self._qr_cache.get(key)
+            if cached is not None and cached[1] is qr:
+                self._qr_cache[key] = (cached[0], cached[1], png_bytes)
+        return png_bytes
         
     def get_image_quality(self) -> int:
-        """الحصول على جودة الصورة بناءً على الإعدادات"""
-        quality_mapping = {
-            "عالية جداً": 100,
-            "عالية": 90,
-            "متوسطة": 75,
-            "منخفضة": 50
-        }
-        return quality_mapping.get(self.app_settings["image_quality"], 90)
+        """الحصول على مستوى ضغط PNG بناءً على إعداد جودة الصورة"""
+        return self.IMAGE_QUALITY_MAPPING.get(self.app_settings.image_quality, 1)
         
-    def update_ui_after_qr_generation(self, img_str: str, size: int, data: str):
+    def update_ui_after_qr_generation(self, img_str: str, size: int, data: str, fields: Tuple[str, str, str]):
         """تحديث واجهة المستخدم بعد توليد QR Code"""
         self.qr_image.src_base64 = img_str
         self.qr_image.width = size
@@ -597,10 +856,11 @@ class QRCodeGeneratorApp:
         self.qr_container.opacity = 1
         self.qr_image.visible = True
         
-        # تحديث البيانات المعروضة
-        self.employee_name_display.value = f"الاسم: {self.employee_name.value}"
-        self.employee_id_display.value = f"الرقم الوظيفي: {self.employee_id.value}"
-        self.department_display.value = f"القسم: {self.department.value}"
+        # تحديث البيانات المعروضة من القيم الملتقطة عند النقر
+        name, employee_id, department = fields
+        self.employee_name_display.value = f"الاسم: {name}"
+        self.employee_id_display.value = f"الرقم الوظيفي: {employee_id}"
+        self.department_display.value = f"القسم: {department}"
         
         # إظهار أزرار وخيارات QR Code
         self.save_button.visible = True
@@ -608,10 +868,21 @@ class QRCodeGeneratorApp:
         self.result_text.color = self.colors["success"]
         self.qr_card.visible = True
         
-    def save_qr_code(self, e):
+    def save_qr_code(self, e, employee_id: Optional[str] = None):
         """حفظ QR Code إلى الملف"""
-        save_path = self.app_settings["save_path"]
-        
+        if employee_id is None:
+            employee_id = self.employee_id.value
+        save_path = self.app_settings.save_path
+        file_path = os.path.join(save_path, f"qr_code_{employee_id}.png")
+        # التقاط الرمز الحالي قبل بدء الخيط، فلا يحفظ الخيط رمزاً وُلد بعد النقر
+        with self._qr_state_lock:
+            qr_state = (self._last_qr, self._last_qr_colors, self._last_qr_key, self.get_image_quality())
+        
+        # الوصول إلى القرص في خيط منفصل حتى تبقى الواجهة مستجيبة
+        self.page.run_thread(self._write_qr_file, save_path, file_path, qr_state)
+        
+    def _write_qr_file(self, save_path: str, file_path: str, qr_state: Tuple[Any, Tuple[str, str], Any, int]):
+        """إنشاء مجلد الحفظ وكتابة ملف QR Code خارج خيط واجهة المستخدم"""
         if not os.path.exists(save_path):
             try:
                 os.makedirs(save_path)
@@ -621,12 +892,12 @@ class QRCodeGeneratorApp:
                 self.page.update()
                 return
         
-        file_path = os.path.join(save_path, f"qr_code_{self.employee_id.value}.png")
-        
         try:
-            img_data = base64.b64decode(self.qr_image.src_base64)
+            # توليد البايتات قبل فتح الملف، فلا يُفرغ ملف سليم موجود إن فشل التوليد
+            png_bytes = self.get_png_bytes(qr_state)
+            # كتابة بايتات PNG مباشرة دون فك ترميز Base64
             with open(file_path, 'wb') as f:
-                f.write(img_data)
+                f.write(png_bytes)
             
             self.save_result.value = f"تم حفظ الصورة في: {file_path}"
             self.save_result.color = self.colors["success"]
@@ -646,6 +917,9 @@ class QRCodeGeneratorApp:
         self.department.value = ""
         self.additional_info.value = ""
         self.qr_image.visible = False
+        with self._qr_state_lock:
+            self._last_qr = None
+            self._last_png_bytes = b""
         self.qr_container.height = 0
         self.qr_container.opacity = 0
         self.save_button.visible = False
@@ -655,7 +929,14 @@ class QRCodeGeneratorApp:
         self.employee_name_display.value = ""
         self.employee_id_display.value = ""
         self.department_display.value = ""
-        self.page.update()
+        self.page.update(
+            self.employee_name,
+            self.employee_id,
+            self.department,
+            self.additional_info,
+            self.result_text,
+            self.qr_card,
+        )
     
     def change_theme(self, e):
         """تغيير سمة التطبيق بين الفاتح والداكن"""
@@ -673,11 +954,15 @@ class QRCodeGeneratorApp:
             self.footer.bgcolor = "#f8fafc"
         self.page.update()
         
-    def show_loading(self, show: bool):
+    def show_loading(self, show: bool, update: bool = True):
         """عرض/إخفاء مؤشر التحميل"""
         self.loading_text.visible = show
         self.progress_ring.visible = show
-        self.page.update()
+        self.generate_button.disabled = show
+        if not update:
+            return
+        # تحديث العناصر المتغيرة فقط بدلاً من إعادة إرسال شجرة الصفحة كاملة
+        self.page.update(self.loading_text, self.progress_ring, self.generate_button)
         
     def show_success_message(self, message: str):
         """عرض رسالة نجاح"""
@@ -704,32 +989,27 @@ class QRCodeGeneratorApp:
     def check_responsive_layout(self, e=None):
         """التحقق من استجابة التخطيط للتغير في حجم النافذة"""
         if self.page.width is not None:
-            if self.page.width < 900:
+            layout_mode = "mobile" if self.page.width < 900 else "desktop"
+            if layout_mode == self._last_layout_mode:
+                # لم يتغير نوع التخطيط؛ في وضع الجوال يتبع عرض الحقول عرض النافذة فقط
+                if layout_mode == "mobile":
+                    self.update_field_width(self.page.width * 0.8)
+                    self.page.update()
+                return
+            self._last_layout_mode = layout_mode
+            
+            if layout_mode == "mobile":
                 self.is_desktop = False
                 self.update_field_width(self.page.width * 0.8)
                 self.sidebar_rail.visible = False
                 self.page_layout.horizontal = False
-                self.page_layout.controls = [
-                    ft.Container(
-                        content=self.main_content,
-                        expand=True,
-                        padding=10,
-                    ),
-                ]
+                self.page_layout.controls = self._mobile_controls
             else:
                 self.is_desktop = True
                 self.update_field_width(400)
                 self.sidebar_rail.visible = True
                 self.page_layout.horizontal = True
-                self.page_layout.controls = [
-                    self.sidebar_rail,
-                    ft.VerticalDivider(width=1),
-                    ft.Container(
-                        content=self.main_content,
-                        expand=True,
-                        padding=20,
-                    ),
-                ]
+                self.page_layout.controls = self._desktop_controls
         
         self.update_card_layouts()
         self.page.update()
@@ -779,12 +1059,15 @@ class QRCodeGeneratorApp:
         
     def create_encryption_info_card(self):
         """إنشاء بطاقة معلومات التشفير"""
-        return ft.Card(
+        if self._about_card is not None:
+            return self._about_card
+        
+        self._about_card = ft.Card(
             content=ft.Container(
                 content=ft.Column(
                     [
                         ft.ListTile(
-                            leading=ft.Icon(ft.icons.SECURITY, color=self.colors["primary"], size=30),
+                            leading=ft.Icon(ft.icons.SECURITY, color=self._c_primary, size=30),
                             title=ft.Text("معلومات عن تشفير البيانات", weight=ft.FontWeight.BOLD, size=20, text_align=ft.TextAlign.RIGHT),
                         ),
                         ft.Divider(height=0, thickness=1),
@@ -818,10 +1101,11 @@ class QRCodeGeneratorApp:
                                     ft.Container(height=10),
                                     self.create_info_list([
                                         "يتم تجميع بيانات الموظف (الاسم، الرقم الوظيفي، القسم وأي معلومات إضافية)",
-                                        "تُشفر البيانات باستخدام خوارزمية AES-256 في وضع CBC (Cipher Block Chaining)",
-                                        "يتم إنشاء متجه التهيئة (IV) بشكل عشوائي لكل عملية تشفير",
+                                        "تُشفر البيانات باستخدام خوارزمية AES-256 في وضع GCM (Galois/Counter Mode)",
+                                        "يتم إنشاء قيمة nonce بشكل عشوائي لكل عملية تشفير",
+                                        "يُحسب وسم مصادقة يكشف أي تعديل على البيانات المشفرة",
                                         "يتم تحويل البيانات المشفرة إلى ترميز Base64",
-                                        "تُدمج البيانات المشفرة مع متجه التهيئة وتُخزن في QR Code"
+                                        "تُدمج البيانات المشفرة مع قيمة nonce ووسم المصادقة وتُخزن في QR Code"
                                     ]),
                                     ft.Container(height=20),
                                     ft.Text(
@@ -850,37 +1134,45 @@ class QRCodeGeneratorApp:
             margin=10,
         )
         
+        return self._about_card
+        
     def create_info_row(self, text: str) -> ft.Row:
         """إنشاء صف معلومات مع أيقونة"""
         return ft.Row(
             [
-                ft.Icon(ft.icons.SHIELD, color=self.colors["primary"], size=20),
-                ft.Text(text, size=14, text_align=ft.TextAlign.RIGHT),
+                ft.Icon(color=self._c_primary, **_SHIELD_KWARGS),
+                ft.Text(text, size=14, text_align=_RIGHT),
             ],
-            alignment=ft.MainAxisAlignment.END,
+            alignment=_END,
         )
         
     def create_info_list(self, items: list) -> ft.Column:
         """إنشاء قائمة معلومات مرقمة"""
         return ft.Column(
-            [ft.Text(f"{i+1}. {item}", size=14, text_align=ft.TextAlign.RIGHT) 
+            [ft.Text((_PREFIXES[i] if i < len(_PREFIXES) else f"{i+1}. ") + item,
+                     size=14, text_align=_RIGHT)
              for i, item in enumerate(items)],
             spacing=5,
         )
         
     def create_settings_card(self):
         """إنشاء بطاقة الإعدادات"""
+        if self._settings_card is not None:
+            # إعادة القيم المحفوظة إلى الحقول وتجاهل أي تعديل لم يُحفظ
+            self._apply_settings_to_ui(self.app_settings)
+            return self._settings_card
+        
         self.auto_save_switch = ft.Switch(
-            value=self.app_settings["auto_save"], 
+            value=self.app_settings.auto_save, 
             label="حفظ تلقائي للصور"
         )
         
         self.save_path_field = ft.TextField(
             label="مسار الحفظ",
-            value=self.app_settings["save_path"],
+            value=self.app_settings.save_path,
             hint_text="أدخل المسار المطلوب لحفظ الصور",
-            border_color=self.colors["primary"],
-            focused_border_color=self.colors["secondary"],
+            border_color=self._c_primary,
+            focused_border_color=self._c_secondary,
             prefix_icon=ft.icons.FOLDER,
             width=400,
             text_size=16,
@@ -891,13 +1183,8 @@ class QRCodeGeneratorApp:
         self.image_quality_dropdown = ft.Dropdown(
             label="جودة الصورة",
             hint_text="اختر جودة صورة QR Code",
-            options=[
-                ft.dropdown.Option("عالية جداً"),
-                ft.dropdown.Option("عالية"),
-                ft.dropdown.Option("متوسطة"),
-                ft.dropdown.Option("منخفضة"),
-            ],
-            value=self.app_settings["image_quality"],
+            options=[ft.dropdown.Option(label) for label in self.IMAGE_QUALITY_MAPPING],
+            value=self.app_settings.image_quality,
             width=400,
             prefix_icon=ft.icons.HIGH_QUALITY,
             text_size=14,
@@ -906,13 +1193,8 @@ class QRCodeGeneratorApp:
         self.qr_size_dropdown = ft.Dropdown(
             label="حجم QR Code",
             hint_text="اختر حجم QR Code",
-            options=[
-                ft.dropdown.Option("صغير"),
-                ft.dropdown.Option("متوسط"),
-                ft.dropdown.Option("كبير"),
-                ft.dropdown.Option("كبير جداً"),
-            ],
-            value=self.app_settings["qr_size"],
+            options=[ft.dropdown.Option(label) for label in self.QR_SIZE_MAPPING],
+            value=self.app_settings.qr_size,
             width=400,
             prefix_icon=ft.icons.PHOTO_SIZE_SELECT_LARGE,
             text_size=14,
@@ -920,10 +1202,10 @@ class QRCodeGeneratorApp:
         
         self.qr_color_picker = ft.TextField(
             label="لون QR Code",
-            value=self.app_settings.get("qr_color", "#000000"),
+            value=self.app_settings.qr_color,
             hint_text="أدخل لون HEX (مثال: #000000)",
-            border_color=self.colors["primary"],
-            focused_border_color=self.colors["secondary"],
+            border_color=self._c_primary,
+            focused_border_color=self._c_secondary,
             prefix_icon=ft.icons.COLOR_LENS,
             width=400,
             text_size=16,
@@ -933,10 +1215,10 @@ class QRCodeGeneratorApp:
         
         self.qr_bg_color_picker = ft.TextField(
             label="لون خلفية QR Code",
-            value=self.app_settings.get("qr_bg_color", "#FFFFFF"),
+            value=self.app_settings.qr_bg_color,
             hint_text="أدخل لون HEX (مثال: #FFFFFF)",
-            border_color=self.colors["primary"],
-            focused_border_color=self.colors["secondary"],
+            border_color=self._c_primary,
+            focused_border_color=self._c_secondary,
             prefix_icon=ft.icons.COLOR_LENS,
             width=400,
             text_size=16,
@@ -947,11 +1229,8 @@ class QRCodeGeneratorApp:
         self.language_dropdown = ft.Dropdown(
             label="اللغة",
             hint_text="اختر لغة التطبيق",
-            options=[
-                ft.dropdown.Option("ar", text="العربية"),
-                ft.dropdown.Option("en", text="الإنجليزية"),
-            ],
-            value=self.app_settings.get("language", "ar"),
+            options=[ft.dropdown.Option(code, text=name) for code, name in _LANGUAGE_OPTIONS],
+            value=self.app_settings.language,
             width=400,
             prefix_icon=ft.icons.LANGUAGE,
             text_size=14,
@@ -961,7 +1240,7 @@ class QRCodeGeneratorApp:
             "حفظ الإعدادات",
             icon=ft.icons.SAVE,
             on_click=self.save_settings_changes,
-            style=self.create_button_style(self.colors["primary"], "white"),
+            style=self.create_button_style(self._c_primary, "white"),
             width=180,
             height=45,
         )
@@ -970,17 +1249,17 @@ class QRCodeGeneratorApp:
             "استعادة الافتراضي",
             icon=ft.icons.RESTORE,
             on_click=self.reset_settings,
-            style=self.create_button_style(self.colors["text"], None),
+            style=self.create_button_style(self._c_text, None),
             width=180,
             height=45,
         )
         
-        return ft.Card(
+        self._settings_card = ft.Card(
             content=ft.Container(
                 content=ft.Column(
                     [
                         ft.ListTile(
-                            leading=ft.Icon(ft.icons.SETTINGS, color=self.colors["primary"], size=30),
+                            leading=ft.Icon(ft.icons.SETTINGS, color=self._c_primary, size=30),
                             title=ft.Text("إعدادات النظام", weight=ft.FontWeight.BOLD, size=20, text_align=ft.TextAlign.RIGHT),
                         ),
                         ft.Divider(height=0, thickness=1),
@@ -1033,6 +1312,8 @@ class QRCodeGeneratorApp:
             margin=10,
         )
         
+        return self._settings_card
+        
     def create_settings_section(self, title: str, controls: list) -> ft.Column:
         """إنشاء قسم في إعدادات التطبيق"""
         return ft.Column(
@@ -1051,68 +1332,72 @@ class QRCodeGeneratorApp:
         
     def save_settings_changes(self, e):
         """حفظ تغييرات الإعدادات"""
-        # التحقق من صحة مسار الحفظ
-        if not self.validate_path(self.save_path_field.value):
-            self.show_error_message("مسار الحفظ غير صحيح أو غير قابل للكتابة")
-            return
-            
-        # التحقق من صحة ألوان QR Code
-        if not self.validate_color(self.qr_color_picker.value):
+        save_path = self.save_path_field.value
+        qr_color = self.qr_color_picker.value
+        qr_bg_color = self.qr_bg_color_picker.value
+        
+        # التحقق من صحة ألوان QR Code أولاً لأنه فحص نصي لا يلمس القرص
+        if not self.validate_color(qr_color):
             self.show_error_message("لون QR Code غير صحيح. استخدم تنسيق HEX مثل #000000")
             return
             
-        if not self.validate_color(self.qr_bg_color_picker.value):
+        if not self.validate_color(qr_bg_color):
             self.show_error_message("لون خلفية QR Code غير صحيح. استخدم تنسيق HEX مثل #FFFFFF")
             return
             
+        # التحقق من صحة مسار الحفظ
+        if not self.validate_path(save_path):
+            self.show_error_message("مسار الحفظ غير صحيح أو غير قابل للكتابة")
+            return
+            
         # تحديث الإعدادات
-        self.app_settings.update({
-            "save_path": self.save_path_field.value,
-            "auto_save": self.auto_save_switch.value,
-            "image_quality": self.image_quality_dropdown.value,
-            "qr_size": self.qr_size_dropdown.value,
-            "qr_color": self.qr_color_picker.value,
-            "qr_bg_color": self.qr_bg_color_picker.value,
-            "language": self.language_dropdown.value
-        })
-        
-        # حفظ الإعدادات
-        self.save_settings()
+        settings = self.app_settings
+        settings.save_path = save_path
+        settings.auto_save = self.auto_save_switch.value
+        settings.image_quality = self.image_quality_dropdown.value
+        settings.qr_size = self.qr_size_dropdown.value
+        settings.qr_color = qr_color
+        settings.qr_bg_color = qr_bg_color
+        settings.language = self.language_dropdown.value
+        
+        # حفظ الإعدادات في خيط منفصل لأن fsync قد يستغرق وقتاً على القرص
+        self.page.run_thread(self.save_settings)
         
         self.show_success_message("تم حفظ الإعدادات بنجاح")
         
     def reset_settings(self, e):
         """استعادة الإعدادات الافتراضية"""
-        default_settings = {
-            "save_path": os.path.join(os.path.expanduser("~"), "QR-pass"),
-            "auto_save": False,
-            "image_quality": "عالية",
-            "qr_size": "متوسط",
-            "qr_color": "#000000",
-            "qr_bg_color": "#FFFFFF",
-            "language": "ar"
-        }
+        default_settings = AppSettings()
         
-        # تحديث واجهة المستخدم
-        self.save_path_field.value = default_settings["save_path"]
-        self.auto_save_switch.value = default_settings["auto_save"]
-        self.image_quality_dropdown.value = default_settings["image_quality"]
-        self.qr_size_dropdown.value = default_settings["qr_size"]
-        self.qr_color_picker.value = default_settings["qr_color"]
-        self.qr_bg_color_picker.value = default_settings["qr_bg_color"]
-        self.language_dropdown.value = default_settings["language"]
+        # تحديث واجهة المستخدم (يُرسل مع تحديث رسالة النجاح في الأسفل)
+        self._apply_settings_to_ui(default_settings)
         
         # تحديث الإعدادات الحالية
-        self.app_settings.update(default_settings)
+        self.app_settings = default_settings
         
-        # حفظ الإعدادات
-        self.save_settings()
+        # حفظ الإعدادات في خيط منفصل
+        self.page.run_thread(self.save_settings)
         
         self.show_success_message("تم استعادة الإعدادات الافتراضية")
         
+    def _apply_settings_to_ui(self, s: AppSettings):
+        """تعيين قيم حقول الإعدادات دون تحديث الصفحة، ليُرسل التغيير في تحديث واحد"""
+        self.save_path_field.value = s.save_path
+        self.auto_save_switch.value = s.auto_save
+        self.image_quality_dropdown.value = s.image_quality
+        self.qr_size_dropdown.value = s.qr_size
+        self.qr_color_picker.value = s.qr_color
+        self.qr_bg_color_picker.value = s.qr_bg_color
+        self.language_dropdown.value = s.language
+        
     def validate_color(self, color: str) -> bool:
         """التحقق من صحة تنسيق لون HEX"""
-        return re.match(r'^#(?:[0-9a-fA-F]{3}){1,2}$', color) is not None
+        # فحص الطول والحرف الأول ثم التحقق من الأرقام الست عشرية بمجموعة ثابتة دون تعبير نمطي
+        return (
+            len(color) in (4, 7)
+            and color[0] == '#'
+            and _HEX_DIGITS.issuperset(color[1:])
+        )
         
     def run(self):
         """تشغيل التطبيق"""